@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Vectorized world -> map image projection for offline tooling.
+Mirrors src/utils/coordinateConverter.ts: world bounds from ortho.asset, per-region
+scaling and offsets from region_offsets.csv. Run with --validate to check agreement
+with golden values produced by the TypeScript converter.
+"""
+
+import csv
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+
+# Default world bounds - EXTRACTED FROM ortho.asset
+# BoundsCenter: {x: 422.5, y: 0, z: 614}
+# BoundsSize: {x: 1732, y: 1732}
+WORLD_X_MIN = -443.5  # 422.5 - (1732/2)
+WORLD_X_MAX = 1288.5  # 422.5 + (1732/2)
+WORLD_Z_MIN = -252.0  # 614 - (1732/2)
+WORLD_Z_MAX = 1480.0  # 614 + (1732/2)
+
+MAP_WIDTH = 16384
+MAP_HEIGHT = 16384
+
+# (scaling, offset_x, offset_y) used if no region-specific config exists
+DEFAULT_TRANSFORM = (30.0, 0, 0)
+
+# Raw CSV coordinates are world units * 1_000_000
+RAW_COORDINATE_SCALE = 1_000_000
+
+# Golden sample produced by CoordinateConverter (src/utils/coordinateConverter.ts).
+# Transforms are pinned here so recalibrating region_offsets.csv doesn't break validation.
+GOLDEN_TRANSFORMS = {
+    'coast': (30.0, 110, 2370),
+    'fortress': (30.5, 90, 2380),
+    'hills': (30.0, 140, 2370),
+    'marinWoods': (30.5, 100, 2400),
+    'mountainPass': (30.0, 210, 2460),
+    'outskirts': (30.5, 90, 2380),
+    'willsFarm': (30.0, 210, 2555),
+    'sacrament': (30.0, 160, 2400),
+    'danosActivities': (30.0, 180, 2420),
+    'finleyActivities': (30.0, 160, 2400),
+    'caylen': (30.0, 285, 2560),
+}
+
+# (region, RawX, RawZ, image x, image y) via worldToImage(RawX / 1e6, RawZ / 1e6, region)
+GOLDEN_WORLD_TO_IMAGE = [
+    ('hills', 15818440, -11908087, 8824, 1374),
+    ('sacrament', 17261440, 5131779, 9253, 6240),
+    ('outskirts', 6588318, 10070077, 6186, 7669),
+    ('sacrament', 14626591, 11902045, 8506, 8161),
+    ('marinWoods', 14613818, 27638580, 8511, 12758),
+    ('coast', -4071096, 79953, 3149, 4776),
+    ('hills', 3303051, -720833, 5272, 4549),
+    ('marinWoods', 12207878, 28833804, 7817, 13102),
+    ('mountainPass', 31946550, 16497010, 13471, 9525),
+    ('fortress', -3774447, 3767467, 3196, 5850),
+    ('outskirts', 6908270, 6313999, 6278, 6585),
+    ('coast', -4329767, 1642726, 3076, 5220),
+    ('fortress', -960430, 3167092, 4008, 5677),
+    ('mountainPass', 27919626, 22979844, 12328, 11365),
+    ('willsFarm', 18921986, 34520760, 9775, 14735),
+    ('willsFarm', 11898716, 32417382, 7782, 14138),
+    ('danosActivities', 15608884, 10470494, 8804, 7775),
+    ('danosActivities', 17696852, 11101607, 9397, 7954),
+    ('caylen', 37685820, 38470944, 15175, 15861),
+    ('caylen', 38165544, 38721944, 15311, 15932),
+    ('finleyActivities', 17279812, 14079820, 9259, 8779),
+    ('unknownRegion', 12345678, -9876543, 7698, -420),
+]
+
+# (region, image x, image y, world x, world z) via imageToWorld(x, y, region)
+GOLDEN_IMAGE_TO_WORLD = [
+    ('default', 8192, 8192, 14.083333333333334, 20.46666666666667),
+    ('default', 0, 16384, -14.783333333333333, 49.333333333333336),
+    ('hills', 5000.5, 12000.25, 2.3439168294270853, 25.53471883138021),
+    ('fortress', 8684, -996, 15.245789574795081, -19.963498975409838),
+]
+
+
+def load_region_transforms(csv_path):
+    """Load per-region (scaling, offset_x, offset_y) from region_offsets.csv."""
+    transforms = {}
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            transforms[row['region'].strip()] = (
+                float(row['scaling']),
+                int(row['offset_x']),
+                int(row['offset_y']),
+            )
+    return transforms
+
+
+def region_from_path(file_path):
+    """Extract region from path like: Assets/worlds/isolaSacra/coast/coastA/loot/loot.unity"""
+    parts = file_path.split('/')
+    return parts[3] if len(parts) > 3 else 'default'
+
+
+def _scaled_bounds(scaling):
+    """World bounds divided by scaling, in the same operation order as the TS converter."""
+    x_min = WORLD_X_MIN / scaling
+    x_max = WORLD_X_MAX / scaling
+    z_min = WORLD_Z_MIN / scaling
+    z_max = WORLD_Z_MAX / scaling
+    return x_min, z_min, x_max - x_min, z_max - z_min
+
+
+def world_to_image(world_x, world_z, transform):
+    """
+    Project world X/Z to map image pixels, matching CoordinateConverter.worldToImage.
+
+    Args:
+        world_x, world_z: Scalars or arrays of world coordinates
+        transform: (scaling, offset_x, offset_y); each may be a scalar or an array
+            broadcastable against the coordinates
+
+    Returns:
+        (px, py) int64 arrays
+    """
+    scaling, offset_x, offset_y = (np.asarray(v) for v in transform)
+    x_min, z_min, width, height = _scaled_bounds(scaling.astype(np.float64))
+
+    norm_x = (np.asarray(world_x, dtype=np.float64) - x_min) / width
+    norm_z = (np.asarray(world_z, dtype=np.float64) - z_min) / height
+
+    px = np.floor(norm_x * MAP_WIDTH).astype(np.int64) + offset_x
+    py = np.floor(norm_z * MAP_HEIGHT).astype(np.int64) + offset_y
+    return px, py
+
+
+def image_to_world(image_x, image_y, transform):
+    """
+    Inverse projection from map image pixels to world X/Z, matching CoordinateConverter.imageToWorld.
+
+    worldToImage floors to whole pixels, so a round trip is exact only up to one
+    pixel (1 / (MAP_WIDTH / world width) world units).
+    """
+    scaling, offset_x, offset_y = (np.asarray(v) for v in transform)
+    x_min, z_min, width, height = _scaled_bounds(scaling.astype(np.float64))
+
+    norm_x = (np.asarray(image_x, dtype=np.float64) - offset_x) / MAP_WIDTH
+    norm_z = (np.asarray(image_y, dtype=np.float64) - offset_y) / MAP_HEIGHT
+
+    return norm_x * width + x_min, norm_z * height + z_min
+
+
+class Projector:
+    """
+    Projects a fixed set of world coordinates with per-region transforms.
+
+    Region membership is resolved once, so re-projecting after offsets are
+    recalibrated is a single vectorized call over all points.
+    """
+
+    def __init__(self, world_x, world_z, regions):
+        self.world_x = np.asarray(world_x, dtype=np.float64)
+        self.world_z = np.asarray(world_z, dtype=np.float64)
+        self.region_names, self.region_codes = np.unique(np.asarray(regions), return_inverse=True)
+
+    def _per_point(self, transforms):
+        params = np.array(
+            [transforms.get(region, DEFAULT_TRANSFORM) for region in self.region_names],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        scaling = params[self.region_codes, 0]
+        offset_x = params[self.region_codes, 1].astype(np.int64)
+        offset_y = params[self.region_codes, 2].astype(np.int64)
+        return scaling, offset_x, offset_y
+
+    def project(self, transforms):
+        """Return (px, py) image coordinates for all points under the given region transforms."""
+        return world_to_image(self.world_x, self.world_z, self._per_point(transforms))
+
+    def unproject(self, image_x, image_y, transforms):
+        """Map image coordinates of the same points back to world X/Z."""
+        return image_to_world(image_x, image_y, self._per_point(transforms))
+
+
+def load_coordinates(csv_path):
+    """
+    Load ids, regions and world coordinates from item_coordinates.csv.
+
+    Returns:
+        dict with 'id' and 'region' lists and 'world_x'/'world_y'/'world_z' arrays
+    """
+    ids, regions, raw = [], [], []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            ids.append(row['id'])
+            regions.append(region_from_path(row['File'].strip()))
+            raw.append((float(row['RawX']), float(row['RawY']), float(row['RawZ'])))
+
+    world = np.asarray(raw, dtype=np.float64).reshape(-1, 3) / RAW_COORDINATE_SCALE
+    return {
+        'id': ids,
+        'region': regions,
+        'world_x': world[:, 0],
+        'world_y': world[:, 1],
+        'world_z': world[:, 2],
+    }
+
+
+def validate(coordinates=None, transforms=None):
+    """
+    Check agreement with the TypeScript converter.
+
+    Compares against the golden sample exactly, and if coordinates are given,
+    checks that projecting then unprojecting them stays within one pixel.
+
+    Returns:
+        List of failure descriptions (empty if everything matches)
+    """
+    failures = []
+
+    regions = [row[0] for row in GOLDEN_WORLD_TO_IMAGE]
+    raw = np.array([row[1:3] for row in GOLDEN_WORLD_TO_IMAGE], dtype=np.float64)
+    projector = Projector(raw[:, 0] / RAW_COORDINATE_SCALE, raw[:, 1] / RAW_COORDINATE_SCALE, regions)
+    px, py = projector.project(GOLDEN_TRANSFORMS)
+    for (region, raw_x, raw_z, ex, ey), x, y in zip(GOLDEN_WORLD_TO_IMAGE, px.tolist(), py.tolist()):
+        if (x, y) != (ex, ey):
+            failures.append(f"worldToImage {region} ({raw_x}, {raw_z}): expected ({ex}, {ey}), got ({x}, {y})")
+
+    for region, image_x, image_y, ex, ez in GOLDEN_IMAGE_TO_WORLD:
+        transform = GOLDEN_TRANSFORMS.get(region, DEFAULT_TRANSFORM)
+        wx, wz = image_to_world(image_x, image_y, transform)
+        if not (np.isclose(wx, ex, rtol=0, atol=1e-12) and np.isclose(wz, ez, rtol=0, atol=1e-12)):
+            failures.append(f"imageToWorld {region} ({image_x}, {image_y}): "
+                            f"expected ({ex}, {ez}), got ({float(wx)}, {float(wz)})")
+
+    if coordinates is not None:
+        projector = Projector(coordinates['world_x'], coordinates['world_z'], coordinates['region'])
+        px, py = projector.project(transforms)
+        wx, wz = projector.unproject(px, py, transforms)
+        # One pixel in world units for the coarsest (smallest) scaling in use
+        scalings = [transforms.get(r, DEFAULT_TRANSFORM)[0] for r in projector.region_names]
+        tolerance = (WORLD_X_MAX - WORLD_X_MIN) / min(scalings) / MAP_WIDTH
+        error = np.maximum(np.abs(wx - projector.world_x), np.abs(wz - projector.world_z))
+        bad = np.flatnonzero(error > tolerance)
+        for idx in bad[:10].tolist():
+            failures.append(f"round trip {coordinates['id'][idx]}: error {error[idx]:.6f} > {tolerance:.6f}")
+        if len(bad) > 10:
+            failures.append(f"... and {len(bad) - 10} more round trip failures")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Project item_coordinates.csv to map image coordinates',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Check agreement with the TypeScript converter
+  python coordinate_projection.py --validate
+
+  # Write projected coordinates for every object
+  python coordinate_projection.py --output projected.csv
+        '''
+    )
+
+    parser.add_argument('--validate', action='store_true', help='Check against the TS golden sample and exit')
+    parser.add_argument(
+        '--csv-path',
+        type=str,
+        help='Path to item_coordinates.csv (default: ../src/assets/item_coordinates.csv)'
+    )
+    parser.add_argument(
+        '--offsets-path',
+        type=str,
+        help='Path to region_offsets.csv (default: ../src/assets/region_offsets.csv)'
+    )
+    parser.add_argument('--output', type=str, help='Optional CSV output path (id,region,image_x,image_y)')
+    parser.add_argument('--repeat', type=int, default=100, help='Timing repetitions (default: 100)')
+
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).resolve().parent
+    assets_dir = script_dir.parent / 'src' / 'assets'
+    csv_path = Path(args.csv_path).resolve() if args.csv_path else assets_dir / 'item_coordinates.csv'
+    offsets_path = Path(args.offsets_path).resolve() if args.offsets_path else assets_dir / 'region_offsets.csv'
+
+    if not csv_path.exists():
+        print(f"Error: CSV file not found at {csv_path}")
+        sys.exit(1)
+    if not offsets_path.exists():
+        print(f"Error: Region offsets file not found at {offsets_path}")
+        sys.exit(1)
+
+    transforms = load_region_transforms(offsets_path)
+    coordinates = load_coordinates(csv_path)
+
+    if args.validate:
+        failures = validate(coordinates, transforms)
+        checked = len(GOLDEN_WORLD_TO_IMAGE) + len(GOLDEN_IMAGE_TO_WORLD)
+        if failures:
+            print(f"✗ {len(failures)} validation failure(s):")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"✓ {checked} golden samples match, {len(coordinates['id'])} objects round-trip within one pixel")
+        return
+
+    projector = Projector(coordinates['world_x'], coordinates['world_z'], coordinates['region'])
+
+    timings = []
+    for _ in range(max(args.repeat, 1)):
+        started = time.perf_counter()
+        px, py = projector.project(transforms)
+        timings.append(time.perf_counter() - started)
+
+    print(f"Projected {len(px)} objects across {len(projector.region_names)} regions")
+    print(f"  best {min(timings) * 1000:.3f} ms, mean {sum(timings) / len(timings) * 1000:.3f} ms "
+          f"over {len(timings)} runs")
+
+    if args.output:
+        output_path = Path(args.output).resolve()
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'region', 'image_x', 'image_y'])
+            writer.writerows(zip(coordinates['id'], coordinates['region'], px.tolist(), py.tolist()))
+        print(f"\n✓ Projected coordinates saved to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""
+Plan farming runs over resource nodes from item_coordinates.csv.
+Builds a grid index over the nodes, seeds a visiting order with nearest neighbour
+and improves it with 2-opt and Or-opt moves, then writes the route as GeoJSON
+polylines in map image coordinates.
+"""
+
+import csv
+import itertools
+import json
+import math
+import sys
+import time
+import argparse
+from pathlib import Path
+from collections import defaultdict
+
+import numpy as np
+
+from coordinate_projection import (
+    RAW_COORDINATE_SCALE,
+    Projector,
+    load_region_transforms,
+    region_from_path,
+)
+
+
+def parse_filter(value):
+    """Split a comma-separated CLI filter into a lowercase set (None means no filter)."""
+    if not value:
+        return None
+    return {part.strip().lower() for part in value.split(',') if part.strip()}
+
+
+# Mirrors TYPES in src/resourceManager.ts; groups mapped to None have no subtypes
+RESOURCE_TYPES = {
+    'ore': {'iron', 'copper', 'silver'},
+    'wood': {'birch', 'spruce', 'pine'},
+    'herb': {'artemisia', 'dracaena', 'lithops', 'mushroom'},
+    'food': {'blueberry', 'firebrandberry', 'horseshoe_crab', 'potato', 'tomato'},
+    'fishing': {'carp', 'trout', 'bass'},
+    'digging': None,
+    'bonfire': None,
+    'whisper': None,
+    'spawner': {
+        'spawner', 'shiny', 'special_shiny', 'small_chest', 'medium_chest',
+        'large_chest', 'special_chest',
+    },
+    'interactible': {
+        'ladder', 'wall_climb', 'door', 'lever', 'readable', 'entrance',
+        'house_entrance', 'platform', 'other',
+    },
+    'destructible': {'des_door', 'wall'},
+    'npc': {'animal', 'boss', 'enemies', 'npc_other'},
+}
+
+# LootSpawnInfo tag -> derived spawner subtype, in extractResourceTypes order
+SPAWNER_TAG_SUBTYPES = [
+    ('specialchest', 'special_chest'),
+    ('specialshiny', 'special_shiny'),
+    ('largechest', 'large_chest'),
+    ('mediumchest', 'medium_chest'),
+    ('smallchest', 'small_chest'),
+    ('shiny', 'shiny'),
+]
+
+
+def is_valid_resource_type(name):
+    """Check whether name is a known group or subtype (isValidResourceType)."""
+    if name in RESOURCE_TYPES:
+        return True
+    return any(name in subtypes for subtypes in RESOURCE_TYPES.values() if subtypes)
+
+
+def is_valid_subtype_for_group(group, subtype):
+    """Check whether subtype belongs to group (isValidSubtypeForGroup)."""
+    if group not in RESOURCE_TYPES:
+        return False
+    subtypes = RESOURCE_TYPES[group]
+    return group == subtype if subtypes is None else subtype in subtypes
+
+
+def spawner_subtypes(loot_spawn_info):
+    """Derive spawner subtypes from LootSpawnInfo tags (extractResourceTypes)."""
+    if loot_spawn_info:
+        try:
+            info = json.loads(loot_spawn_info)
+        except json.JSONDecodeError:
+            info = {}
+        tags = {tag.lower() for tag in (info.get('anyTags') or []) + (info.get('allTags') or [])}
+        derived = [subtype for tag, subtype in SPAWNER_TAG_SUBTYPES if tag in tags]
+        if derived:
+            return derived
+    # Fallback for spawner without recognized tags
+    return ['spawner']
+
+
+def load_nodes(csv_path, disabled_path=None, types=None, subtypes=None, regions=None):
+    """
+    Load matching nodes from item_coordinates.csv.
+
+    Applies the same disabled-item, invalid-type and duplicate filtering as the
+    web map, and expands spawners into their tag-derived subtypes (shiny,
+    small_chest, ...). A spawner matching several requested subtypes becomes a
+    single node, since it only needs to be visited once.
+
+    Args:
+        csv_path: Path to item_coordinates.csv
+        disabled_path: Optional path to item_disabled.json
+        types, subtypes, regions: Optional lowercase sets to filter by
+
+    Returns:
+        (nodes, coords) where nodes is a list of dicts and coords is an (n, 3)
+        array of world X/Y/Z coordinates.
+    """
+    disabled = set()
+    if disabled_path and Path(disabled_path).exists():
+        with open(disabled_path, 'r', encoding='utf-8') as f:
+            disabled = set(json.load(f))
+
+    nodes = []
+    coords = []
+    seen = set()
+
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if row['id'] in disabled:
+                continue
+
+            node_type = row['Type'].strip().lower()
+            subtype = row['Subtype'].strip().lower()
+
+            if node_type == 'spawner':
+                row_subtypes = spawner_subtypes(row.get('LootSpawnInfo', ''))
+            elif (is_valid_resource_type(node_type) and is_valid_resource_type(subtype)
+                  and is_valid_subtype_for_group(node_type, subtype)):
+                row_subtypes = [subtype]
+            else:
+                continue
+
+            world_x = float(row['RawX']) / RAW_COORDINATE_SCALE
+            world_y = float(row['RawY']) / RAW_COORDINATE_SCALE
+            world_z = float(row['RawZ']) / RAW_COORDINATE_SCALE
+
+            # Same duplicate key as the web map (rounded to avoid floating point issues),
+            # checked before filtering so the same entries survive as on the map
+            kept = []
+            for row_subtype in row_subtypes:
+                key = f"{node_type}:{row_subtype}:{world_x:.3f}:{world_z:.3f}"
+                if key in seen:
+                    continue
+                seen.add(key)
+                kept.append(row_subtype)
+
+            region = region_from_path(row['File'].strip())
+            if types is not None and node_type not in types:
+                continue
+            if regions is not None and region.lower() not in regions:
+                continue
+            if subtypes is not None:
+                kept = [row_subtype for row_subtype in kept if row_subtype in subtypes]
+            if not kept:
+                continue
+
+            nodes.append({
+                'id': row['id'],
+                'type': node_type,
+                'subtype': kept[0],
+                'name': row['Name'].strip(),
+                'region': region,
+            })
+            coords.append((world_x, world_y, world_z))
+
+    return nodes, np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+
+
+class GridIndex:
+    """Uniform grid over the X/Z plane used to find nearest-neighbour candidates."""
+
+    def __init__(self, coords, cell_size=None):
+        self.coords = coords
+        xz = coords[:, [0, 2]]
+
+        if cell_size is None:
+            extent = np.ptp(xz, axis=0)
+            area = max(float(extent[0] * extent[1]), 1.0)
+            # Aim for a handful of nodes per cell
+            cell_size = math.sqrt(area / len(coords) * 4)
+        self.cell_size = max(cell_size, 1e-6)
+
+        cells = np.floor((xz - xz.min(axis=0)) / self.cell_size).astype(np.int64)
+        self.max_ring = int(cells.max()) + 1
+
+        self.cells = defaultdict(list)
+        for idx, (cx, cz) in enumerate(cells.tolist()):
+            self.cells[(cx, cz)].append(idx)
+
+    def _ring(self, cell, r):
+        """Yield node indices in the square ring of cells at Chebyshev distance r from cell."""
+        cx, cz = cell
+        if r == 0:
+            yield from self.cells.get(cell, ())
+            return
+        for dx in range(-r, r + 1):
+            yield from self.cells.get((cx + dx, cz - r), ())
+            yield from self.cells.get((cx + dx, cz + r), ())
+        for dz in range(-r + 1, r):
+            yield from self.cells.get((cx - r, cz + dz), ())
+            yield from self.cells.get((cx + r, cz + dz), ())
+
+    def knn(self, k):
+        """
+        Compute the k nearest neighbours (by 3D distance) of every node.
+
+        Candidates are gathered cell by cell from growing rings and ranked with
+        a vectorized distance block, so the cost stays near-linear in n.
+
+        Returns:
+            (n, k) array of neighbour indices sorted by distance
+        """
+        n = len(self.coords)
+        k = min(k, n - 1)
+        neighbours = np.empty((n, max(k, 0)), dtype=np.int64)
+        if k <= 0:
+            return neighbours
+
+        for cell, members in self.cells.items():
+            members = np.asarray(members)
+            candidates = list(self._ring(cell, 0))
+            r = 0
+            while True:
+                r += 1
+                candidates.extend(self._ring(cell, r))
+                if len(candidates) <= k and r <= self.max_ring:
+                    continue
+
+                cand = np.asarray(candidates)
+                block = self.coords[members][:, None, :] - self.coords[cand][None, :, :]
+                dist = np.sqrt((block ** 2).sum(axis=2))
+                dist[members[:, None] == cand[None, :]] = np.inf
+
+                # Nodes outside the searched rings are at least r cells away in X/Z,
+                # which bounds their 3D distance from below
+                order = np.argpartition(dist, k - 1, axis=1)[:, :k]
+                row_dist = np.take_along_axis(dist, order, axis=1)
+                if row_dist.max() > r * self.cell_size and r <= self.max_ring:
+                    continue
+
+                order = np.take_along_axis(order, np.argsort(row_dist, axis=1), axis=1)
+                neighbours[members] = cand[order]
+                break
+
+        return neighbours
+
+
+def nearest_neighbour_order(coords, start=0):
+    """Greedy nearest-neighbour visiting order starting from node `start`."""
+    n = len(coords)
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    current = start
+
+    for _ in range(n - 1):
+        dist = ((coords - coords[current]) ** 2).sum(axis=1)
+        dist[visited] = np.inf
+        current = int(dist.argmin())
+        visited[current] = True
+        order.append(current)
+
+    return order
+
+
+class RouteOptimizer:
+    """
+    2-opt and Or-opt local search over a tour restricted to neighbour-list candidates.
+
+    Open routes are solved as a closed tour through a virtual depot node that is
+    free to reach from every node; cutting the tour at the depot yields the path.
+    When a start node is pinned, the depot-start edge is never removed.
+    """
+
+    EPSILON = 1e-9
+
+    def __init__(self, coords, neighbours, closed=False, start=None):
+        self.points = [tuple(p) for p in coords.tolist()]
+        self.n = len(self.points)
+        self.closed = closed
+        self.depot = None if closed else self.n
+        self.start = start
+
+        self.neighbours = [row.tolist() for row in neighbours]
+        if self.depot is not None:
+            self.neighbours.append([])
+
+        self.tour = []
+        self.pos = []
+
+    def dist(self, a, b):
+        if a == self.depot or b == self.depot:
+            return 0.0
+        return math.dist(self.points[a], self.points[b])
+
+    def length(self):
+        m = len(self.tour)
+        return sum(self.dist(self.tour[i], self.tour[(i + 1) % m]) for i in range(m))
+
+    def set_order(self, order):
+        """Initialise the tour from a visiting order over the real nodes."""
+        self.tour = list(order)
+        if self.depot is not None:
+            self.tour.insert(0, self.depot)
+        self._reindex()
+
+    def route(self):
+        """Return the visiting order over real nodes, beginning at the start node if pinned."""
+        if self.depot is None:
+            if self.start is None:
+                return list(self.tour)
+            i = self.pos[self.start]
+            return self.tour[i:] + self.tour[:i]
+        i = self.pos[self.depot]
+        order = self.tour[i + 1:] + self.tour[:i]
+        if self.start is not None and order and order[0] != self.start:
+            order.reverse()
+        return order
+
+    def _reindex(self):
+        self.pos = [0] * len(self.tour)
+        for i, node in enumerate(self.tour):
+            self.pos[node] = i
+
+    def _succ(self, node):
+        return self.tour[(self.pos[node] + 1) % len(self.tour)]
+
+    def _pred(self, node):
+        return self.tour[self.pos[node] - 1]
+
+    def _pinned(self, a, b):
+        if self.start is None or self.depot is None:
+            return False
+        return {a, b} == {self.depot, self.start}
+
+    def _reverse(self, first, last):
+        """Reverse the tour segment running forward from `first` to `last`."""
+        m = len(self.tour)
+        i, j = self.pos[first], self.pos[last]
+        size = (j - i) % m + 1
+        # Reversing the complement gives the same cycle and touches fewer nodes
+        if size * 2 > m:
+            i, j = (j + 1) % m, (i - 1) % m
+            size = m - size
+        for _ in range(size // 2):
+            a, b = self.tour[i], self.tour[j]
+            self.tour[i], self.tour[j] = b, a
+            self.pos[b], self.pos[a] = i, j
+            i = (i + 1) % m
+            j = (j - 1) % m
+
+    def two_opt(self):
+        """Apply improving 2-opt moves until none remain. Returns True if the tour changed."""
+        improved = False
+        active = list(range(self.n))
+        queued = [True] * len(self.tour)
+
+        while active:
+            a = active.pop()
+            queued[a] = False
+            moved = None
+
+            for forward in (True, False):
+                b = self._succ(a) if forward else self._pred(a)
+                if self._pinned(a, b):
+                    continue
+                d_ab = self.dist(a, b)
+                for c in self.neighbours[a]:
+                    d_ac = self.dist(a, c)
+                    if d_ac >= d_ab:
+                        break
+                    d = self._succ(c) if forward else self._pred(c)
+                    if c == b or d == a or self._pinned(c, d):
+                        continue
+                    delta = d_ac + self.dist(b, d) - d_ab - self.dist(c, d)
+                    if delta < -self.EPSILON:
+                        if forward:
+                            self._reverse(b, c)
+                        else:
+                            self._reverse(a, d)
+                        moved = (a, b, c, d)
+                        break
+                if moved:
+                    break
+
+            if moved:
+                improved = True
+                for node in moved:
+                    if node != self.depot and not queued[node]:
+                        queued[node] = True
+                        active.append(node)
+
+        return improved
+
+    def or_opt(self, max_segment=3):
+        """
+        Relocate segments of up to `max_segment` nodes next to one of their neighbours.
+
+        Returns True if the tour changed.
+        """
+        improved = False
+        m = len(self.tour)
+        if m < max_segment + 3:
+            return False
+
+        for seg_len in range(1, max_segment + 1):
+            for s1 in range(self.n):
+                i = self.pos[s1]
+                segment = [self.tour[(i + k) % m] for k in range(seg_len)]
+                if self.depot in segment or (self.start in segment and self.depot is not None):
+                    continue
+                s2 = segment[-1]
+                p = self._pred(s1)
+                nx = self._succ(s2)
+                if self._pinned(p, s1) or self._pinned(s2, nx):
+                    continue
+
+                removal_gain = self.dist(p, s1) + self.dist(s2, nx) - self.dist(p, nx)
+                if removal_gain <= self.EPSILON:
+                    continue
+
+                best = None
+                for end, other in ((s1, s2), (s2, s1)):
+                    for c in self.neighbours[end]:
+                        if self.dist(c, end) >= removal_gain:
+                            break
+                        if c in segment:
+                            continue
+                        # Insert between c and its successor or its predecessor,
+                        # with `end` adjacent to c
+                        for e, after in ((self._succ(c), True), (self._pred(c), False)):
+                            if e in segment or self._pinned(c, e):
+                                continue
+                            delta = (self.dist(c, end) + self.dist(other, e)
+                                     - self.dist(c, e) - removal_gain)
+                            if delta < -self.EPSILON and (best is None or delta < best[0]):
+                                best = (delta, c, after, end == s1)
+
+                if best is None:
+                    continue
+
+                _, c, after, s1_next_to_c = best
+                rest = [node for node in self.tour if node not in segment]
+                at = rest.index(c)
+                # Keep `end` adjacent to c in tour order
+                moved = segment if s1_next_to_c == after else segment[::-1]
+                at = at + 1 if after else at
+                self.tour = rest[:at] + moved + rest[at:]
+                self._reindex()
+                improved = True
+
+        return improved
+
+    def optimize(self, max_rounds=50):
+        """Alternate 2-opt and Or-opt until neither improves the tour."""
+        for _ in range(max_rounds):
+            changed = self.two_opt()
+            changed = self.or_opt() or changed
+            if not changed:
+                break
+
+
+def plan_route(coords, closed=False, start=None, neighbours_k=10):
+    """
+    Compute a near-optimal visiting order over the given nodes.
+
+    Args:
+        coords: (n, 3) array of world coordinates
+        closed: Return to the first node at the end of the run
+        start: Optional index of the node to start from
+        neighbours_k: Neighbour list size for local search candidates
+
+    Returns:
+        (order, seed_length, length)
+    """
+    n = len(coords)
+    if n <= 3:
+        # Too small for local search; just try every order (at most 6)
+        def route_length(order):
+            length = sum((math.dist(coords[a], coords[b]) for a, b in zip(order, order[1:])), 0.0)
+            if closed and n > 1:
+                length += math.dist(coords[order[-1]], coords[order[0]])
+            return length
+
+        orders = [
+            list(order) for order in itertools.permutations(range(n))
+            if start is None or order[0] == start
+        ]
+        order = min(orders, key=route_length)
+        length = route_length(order)
+        return order, length, length
+
+    grid = GridIndex(coords)
+    neighbours = grid.knn(neighbours_k)
+
+    optimizer = RouteOptimizer(coords, neighbours, closed=closed, start=start)
+    optimizer.set_order(nearest_neighbour_order(coords, start if start is not None else 0))
+    seed_length = optimizer.length()
+
+    optimizer.optimize()
+    return optimizer.route(), seed_length, optimizer.length()
+
+
+def route_feature(nodes, coords, order, transforms, closed, properties):
+    """Build a GeoJSON LineString feature in map image coordinates."""
+    if closed and order:
+        order = order + order[:1]
+
+    projector = Projector(coords[order, 0], coords[order, 2], [nodes[idx]['region'] for idx in order])
+    px, py = projector.project(transforms)
+    line = [[x, y] for x, y in zip(px.tolist(), py.tolist())]
+
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'LineString', 'coordinates': line},
+        'properties': {
+            **properties,
+            'nodes': [nodes[idx]['id'] for idx in order],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Plan a farming route over resource nodes',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # All iron and silver ore in the hills
+  python optimize_loot_route.py --types ore --subtypes iron,silver --regions hills
+
+  # One closed loop per region over every herb, starting near a world position
+  python optimize_loot_route.py --types herb --per-region --closed --start 15.8,-11.9
+        '''
+    )
+
+    parser.add_argument('--types', type=str, help='Comma-separated types (e.g. ore,herb)')
+    parser.add_argument('--subtypes', type=str, help='Comma-separated subtypes (e.g. iron,silver)')
+    parser.add_argument('--regions', type=str, help='Comma-separated regions (e.g. hills,coast)')
+    parser.add_argument('--closed', action='store_true', help='Return to the starting node')
+    parser.add_argument('--per-region', action='store_true', help='Plan a separate route per region')
+    parser.add_argument(
+        '--start',
+        type=str,
+        help='World X,Z position as shown in the map coordinate display (e.g. 15.8,-11.9); '
+             'the route starts at the nearest matching node'
+    )
+    parser.add_argument('--neighbours', type=int, default=10, help='Candidate neighbours per node (default: 10)')
+    parser.add_argument(
+        '--csv-path',
+        type=str,
+        help='Path to item_coordinates.csv (default: ../src/assets/item_coordinates.csv)'
+    )
+    parser.add_argument(
+        '--disabled-path',
+        type=str,
+        help='Path to item_disabled.json (default: next to the CSV file)'
+    )
+    parser.add_argument(
+        '--offsets-path',
+        type=str,
+        help='Path to region_offsets.csv (default: ../src/assets/region_offsets.csv)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='route.geojson',
+        help='Output path for route GeoJSON (default: route.geojson)'
+    )
+
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).resolve().parent
+    assets_dir = script_dir.parent / 'src' / 'assets'
+    csv_path = Path(args.csv_path).resolve() if args.csv_path else assets_dir / 'item_coordinates.csv'
+    offsets_path = Path(args.offsets_path).resolve() if args.offsets_path else assets_dir / 'region_offsets.csv'
+    disabled_path = (Path(args.disabled_path).resolve() if args.disabled_path
+                     else csv_path.parent / 'item_disabled.json')
+
+    if not csv_path.exists():
+        print(f"Error: CSV file not found at {csv_path}")
+        sys.exit(1)
+    if not offsets_path.exists():
+        print(f"Error: Region offsets file not found at {offsets_path}")
+        sys.exit(1)
+    if args.disabled_path and not disabled_path.exists():
+        print(f"Error: Disabled items file not found at {disabled_path}")
+        sys.exit(1)
+
+    start_position = None
+    if args.start:
+        try:
+            start_position = tuple(float(v) for v in args.start.split(','))
+        except ValueError:
+            start_position = ()
+        if len(start_position) != 2:
+            print(f"Error: --start must be X,Z, got '{args.start}'")
+            sys.exit(1)
+
+    transforms = load_region_transforms(offsets_path)
+    nodes, coords = load_nodes(
+        csv_path,
+        disabled_path,
+        types=parse_filter(args.types),
+        subtypes=parse_filter(args.subtypes),
+        regions=parse_filter(args.regions),
+    )
+    print(f"Loaded {len(nodes)} matching nodes from {csv_path}")
+    if not nodes:
+        print("✗ No nodes match the given filters")
+        sys.exit(1)
+
+    groups = defaultdict(list)
+    for idx, node in enumerate(nodes):
+        groups[node['region'] if args.per_region else 'all'].append(idx)
+
+    features = []
+    total_start = time.perf_counter()
+    for name, members in sorted(groups.items()):
+        members = np.asarray(members)
+        group_coords = coords[members]
+
+        start = None
+        if start_position is not None:
+            offsets = group_coords[:, [0, 2]] - np.asarray(start_position)
+            start = int((offsets ** 2).sum(axis=1).argmin())
+
+        started = time.perf_counter()
+        order, seed_length, length = plan_route(
+            group_coords, closed=args.closed, start=start, neighbours_k=args.neighbours
+        )
+        elapsed = time.perf_counter() - started
+
+        print(f"  {name}: {len(members)} nodes, "
+              f"nearest neighbour {seed_length:.1f} -> optimized {length:.1f} "
+              f"({elapsed:.2f}s)")
+
+        features.append(route_feature(
+            nodes,
+            coords,
+            [int(members[idx]) for idx in order],
+            transforms,
+            args.closed,
+            {
+                'name': name,
+                'types': sorted({nodes[idx]['type'] for idx in members}),
+                'subtypes': sorted({nodes[idx]['subtype'] for idx in members}),
+                'regions': sorted({nodes[idx]['region'] for idx in members}),
+                'closed': args.closed,
+                'length': round(length, 2),
+            },
+        ))
+
+    output_path = Path(args.output).resolve()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+    print(f"\n✓ Planned {len(features)} route(s) in {time.perf_counter() - total_start:.2f}s")
+    print(f"✓ Routes saved to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Write maximum-level gzip and Brotli variants next to static data artifacts.
+Compressed variants are cached by content hash outside the served tree, so files
+that didn't change are restored from the cache instead of being recompressed,
+even after `vite build` empties dist/.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import argparse
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Text-like artifacts worth compressing (tiles are JPEG and are left as-is)
+COMPRESSIBLE_EXTENSIONS = {
+    '.csv', '.json', '.geojson', '.js', '.mjs', '.css', '.html', '.svg',
+    '.txt', '.xml', '.webmanifest', '.map',
+}
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Kept out of dist/ so it survives rebuilds and never ships with the deploy
+DEFAULT_CACHE_DIR = REPO_DIR / 'node_modules' / '.cache' / 'precompress'
+
+VARIANT_SUFFIXES = ('.gz', '.br')
+
+
+def file_hash(data):
+    """Return the SHA-256 hex digest of the given bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def compress_gzip(data):
+    """Gzip at level 9 with a fixed mtime so output is reproducible."""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data):
+    """Brotli at maximum quality and window size."""
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11, lgwin=24)
+
+
+def find_artifacts(root, min_size):
+    """Collect compressible files under root (or root itself if it is a file)."""
+    root = Path(root)
+    candidates = [root] if root.is_file() else sorted(p for p in root.rglob('*') if p.is_file())
+    return [
+        path for path in candidates
+        if path.suffix.lower() in COMPRESSIBLE_EXTENSIONS
+        and path.stat().st_size >= min_size
+    ]
+
+
+class VariantCache:
+    """
+    Content-addressed store of compressed variants plus a path -> hash index.
+
+    Variants live under <cache_dir>/variants/<sha256><suffix>; an empty
+    <sha256><suffix>.skip marker records that the variant wasn't smaller than the
+    source. The index is keyed by path relative to the repository and drives
+    pruning of unused variants.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.variants_dir = self.cache_dir / 'variants'
+        self.index_path = self.cache_dir / 'index.json'
+        self.index = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.index = {}
+
+    def variant_path(self, digest, suffix):
+        return self.variants_dir / (digest + suffix)
+
+    def skip_path(self, digest, suffix):
+        return self.variants_dir / (digest + suffix + '.skip')
+
+    def lookup(self, digest, suffix):
+        """
+        Look up a cached variant.
+
+        Returns:
+            (found, data) where data is None if the variant is known not to help
+        """
+        if self.skip_path(digest, suffix).exists():
+            return True, None
+        path = self.variant_path(digest, suffix)
+        if not path.exists():
+            return False, None
+        with open(path, 'rb') as f:
+            return True, f.read()
+
+    def store(self, digest, suffix, data):
+        """Cache a variant, or a skip marker when data is None."""
+        self.variants_dir.mkdir(parents=True, exist_ok=True)
+        path = self.variant_path(digest, suffix) if data is not None else self.skip_path(digest, suffix)
+        with open(path, 'wb') as f:
+            f.write(data or b'')
+
+    def record(self, path, digest):
+        self.index[index_key(path)] = digest
+
+    def forget_missing(self, root, seen):
+        """Drop index entries under root that weren't seen in this run."""
+        prefix = index_key(root)
+        for key in list(self.index):
+            if (key == prefix or key.startswith(prefix.rstrip('/') + '/')) and key not in seen:
+                del self.index[key]
+
+    def save(self):
+        """Write the index and drop variants no indexed file refers to."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
+        live = set(self.index.values())
+        if self.variants_dir.exists():
+            for variant in self.variants_dir.iterdir():
+                if variant.name.split('.', 1)[0] not in live:
+                    variant.unlink()
+
+
+def index_key(path):
+    """Path relative to the repository (absolute for files outside it)."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_DIR).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def sync_variant(path, suffix, data):
+    """
+    Make the variant next to path hold data, or remove it when data is None.
+
+    Returns:
+        Size of the variant now next to path, or None if there is none
+    """
+    variant_path = path.with_name(path.name + suffix)
+    if data is None:
+        if variant_path.exists():
+            variant_path.unlink()
+        return None
+    with open(variant_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def remove_orphaned_variants(root, seen):
+    """
+    Remove .gz/.br files under root whose source wasn't processed in this run
+    (deleted, renamed or now below --min-size).
+
+    Returns:
+        Number of removed files
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return 0
+    removed = 0
+    for suffix in VARIANT_SUFFIXES:
+        for variant in root.rglob('*' + suffix):
+            source = variant.with_name(variant.name[:-len(suffix)])
+            if source.suffix.lower() in COMPRESSIBLE_EXTENSIONS and index_key(source) not in seen:
+                variant.unlink()
+                removed += 1
+    return removed
+
+
+def compress_variant(data, compressor):
+    """Compress data, returning None when the result would not be smaller."""
+    compressed = compressor(data)
+    return compressed if len(compressed) < len(data) else None
+
+
+def precompress(roots, cache, min_size=256, force=False):
+    """
+    Precompress all artifacts under the given roots.
+
+    Unchanged files get their variants restored from the cache. A variant that
+    can't be produced (no brotli module, or no size gain) is removed from next
+    to the file so a stale one is never served.
+
+    Args:
+        roots: Files or directories to process
+        cache: VariantCache holding previously compressed variants
+        min_size: Skip files smaller than this many bytes
+        force: Recompress even if the content hash is unchanged
+
+    Variants next to sources that no longer exist are removed, and their index
+    entries dropped so the cached variants get pruned.
+
+    Returns:
+        (rows, removed) where rows are (path, original, gzip, brotli, status)
+        and removed is the number of orphaned variant files deleted
+    """
+    compressors = {'.gz': compress_gzip, '.br': compress_brotli if brotli is not None else None}
+    rows = []
+    removed = 0
+
+    for root in roots:
+        root = Path(root).resolve()
+        seen = set()
+        for path in find_artifacts(root, min_size):
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = file_hash(data)
+
+            sizes = {}
+            status = 'unchanged'
+            for suffix in VARIANT_SUFFIXES:
+                compressor = compressors[suffix]
+                found, variant = (False, None) if force else cache.lookup(digest, suffix)
+                if not found and compressor is not None:
+                    variant = compress_variant(data, compressor)
+                    cache.store(digest, suffix, variant)
+                    status = 'compressed'
+                sizes[suffix] = sync_variant(path, suffix, variant)
+
+            cache.record(path, digest)
+            seen.add(index_key(path))
+            rows.append((path, len(data), sizes['.gz'], sizes['.br'], status))
+
+        cache.forget_missing(root, seen)
+        removed += remove_orphaned_variants(root, seen)
+
+    cache.save()
+    return rows, removed
+
+
+def format_size(size):
+    return '-' if size is None else f"{size:,}"
+
+
+def print_table(rows):
+    """Print a before/after byte table with per-file and total savings."""
+    names = [os.path.relpath(path) for path, *_ in rows]
+    width = max([len('File')] + [len(name) for name in names])
+
+    header = f"{'File':<{width}}  {'Original':>12}  {'gzip':>12}  {'brotli':>12}  {'Saved':>7}  Status"
+    print(header)
+    print('-' * len(header))
+
+    total_original = 0
+    total_gzip = 0
+    total_brotli = 0
+    total_best = 0
+    for name, (_, original, gzip_size, brotli_size, status) in zip(names, rows):
+        best = min(size for size in (original, gzip_size, brotli_size) if size is not None)
+        saved = 100 * (1 - best / original) if original else 0
+        # Files without a variant are served uncompressed
+        total_original += original
+        total_gzip += original if gzip_size is None else gzip_size
+        total_brotli += original if brotli_size is None else brotli_size
+        total_best += best
+        print(f"{name:<{width}}  {format_size(original):>12}  {format_size(gzip_size):>12}  "
+              f"{format_size(brotli_size):>12}  {saved:>6.1f}%  {status}")
+
+    print('-' * len(header))
+    saved = 100 * (1 - total_best / total_original) if total_original else 0
+    print(f"{'Total':<{width}}  {format_size(total_original):>12}  {format_size(total_gzip):>12}  "
+          f"{format_size(total_brotli if brotli is not None else None):>12}  {saved:>6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write gzip and Brotli variants next to static data artifacts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Precompress the build output (default)
+  python precompress_assets.py
+
+  # Precompress specific directories
+  python precompress_assets.py ../dist ../public/tiles
+        '''
+    )
+
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help='Files or directories to precompress (default: ../dist)'
+    )
+    parser.add_argument(
+        '--min-size',
+        type=int,
+        default=256,
+        help='Skip files smaller than this many bytes (default: 256)'
+    )
+    parser.add_argument('--force', action='store_true', help='Recompress even if unchanged')
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='Where compressed variants are cached (default: ../node_modules/.cache/precompress)'
+    )
+
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).resolve().parent
+    roots = [Path(p).resolve() for p in args.paths] or [script_dir.parent / 'dist']
+
+    for root in roots:
+        if not root.exists():
+            print(f"Error: {root} not found")
+            sys.exit(1)
+
+    if brotli is None:
+        print("Warning: 'brotli' module not installed, writing gzip variants only")
+        print("  pip install brotli\n")
+
+    cache = VariantCache(Path(args.cache_dir).resolve() if args.cache_dir else DEFAULT_CACHE_DIR)
+    rows, removed = precompress(roots, cache, min_size=args.min_size, force=args.force)
+    if removed:
+        print(f"Removed {removed} orphaned variant file(s)\n")
+    if not rows:
+        print("✗ No compressible files found")
+        return
+
+    print_table(rows)
+
+    compressed = sum(1 for row in rows if row[4] == 'compressed')
+    print(f"\n✓ Compressed {compressed} file(s), {len(rows) - compressed} unchanged (restored from cache)")
+
+
+if __name__ == '__main__':
+    main()
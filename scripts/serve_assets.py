@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Local dev server for generated map tiles and data assets.
+Serves files from directories or pack files through an in-memory LRU byte cache,
+with ETag/If-None-Match, HTTP range requests and latency/hit-rate counters
+exposed at /__stats for local load testing.
+"""
+
+import asyncio
+import hashlib
+import json
+import mimetypes
+import mmap
+import struct
+import sys
+import time
+import argparse
+from collections import OrderedDict, deque
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import unquote, urlsplit, parse_qs
+
+
+PACK_MAGIC = b'NRFTWPK1'
+# Magic followed by the little-endian byte length of the JSON index
+PACK_HEADER = struct.Struct('<8sQ')
+
+STATS_PATH = '/__stats'
+
+MAX_HEADER_BYTES = 16 * 1024
+
+mimetypes.add_type('text/csv', '.csv')
+mimetypes.add_type('application/geo+json', '.geojson')
+
+STATUS_REASONS = {
+    200: 'OK',
+    206: 'Partial Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable',
+    500: 'Internal Server Error',
+}
+
+
+class LRUCache:
+    """Byte-size bounded LRU cache of file entries."""
+
+    def __init__(self, max_bytes, max_entry_bytes):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        """Return the entry for key if it matches version; stale entries count as misses."""
+        entry = self.entries.get(key)
+        if entry is not None and entry.version != version:
+            self.discard(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """Insert an entry, evicting least recently used ones to stay within max_bytes."""
+        self.discard(key)
+        # Reject before evicting, so an oversized file can't flush the cache
+        if len(entry.data) > min(self.max_entry_bytes, self.max_bytes):
+            return
+        self.entries[key] = entry
+        self.size += len(entry.data)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.data)
+            self.evictions += 1
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class Entry:
+    """A cached file body with its validator."""
+
+    __slots__ = ('data', 'etag', 'content_type', 'version')
+
+    def __init__(self, data, content_type, version):
+        self.data = data
+        self.etag = '"' + hashlib.blake2b(data, digest_size=12).hexdigest() + '"'
+        self.content_type = content_type
+        self.version = version
+
+
+class DirectorySource:
+    """Serves files from a directory, one open per cache miss."""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+
+    def resolve(self, rel_path):
+        path = (self.root / rel_path).resolve()
+        if path != self.root and self.root not in path.parents:
+            return None
+        return path
+
+    def version(self, rel_path):
+        """Return a cheap change marker (mtime, size), or None if the file is missing."""
+        path = self.resolve(rel_path)
+        if path is None:
+            return None
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read(self, rel_path):
+        with open(self.resolve(rel_path), 'rb') as f:
+            return f.read()
+
+    def describe(self):
+        return str(self.root)
+
+
+class PackSource:
+    """Serves files from a single memory-mapped pack file built with --build-pack."""
+
+    def __init__(self, pack_path):
+        self.path = Path(pack_path).resolve()
+        self.file = open(self.path, 'rb')
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_length = PACK_HEADER.unpack_from(self.mmap, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{self.path} is not a pack file")
+        index_start = PACK_HEADER.size
+        self.data_start = index_start + index_length
+        self.index = json.loads(self.mmap[index_start:self.data_start])
+        # Pack contents never change while mapped
+        self.stamp = self.path.stat().st_mtime_ns
+
+    def version(self, rel_path):
+        return self.stamp if rel_path in self.index else None
+
+    def read(self, rel_path):
+        offset, length = self.index[rel_path]
+        start = self.data_start + offset
+        return self.mmap[start:start + length]
+
+    def describe(self):
+        return f"{self.path} ({len(self.index)} files)"
+
+
+def build_pack(source_dir, output_path):
+    """Concatenate every file under source_dir into a pack file with a JSON index."""
+    source_dir = Path(source_dir).resolve()
+    files = sorted(p for p in source_dir.rglob('*') if p.is_file())
+
+    index = {}
+    offset = 0
+    for path in files:
+        size = path.stat().st_size
+        index[path.relative_to(source_dir).as_posix()] = (offset, size)
+        offset += size
+
+    index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+    with open(output_path, 'wb') as out:
+        out.write(PACK_HEADER.pack(PACK_MAGIC, len(index_bytes)))
+        out.write(index_bytes)
+        for path in files:
+            with open(path, 'rb') as f:
+                out.write(f.read())
+
+    print(f"✓ Packed {len(files)} files ({offset:,} bytes) into {output_path}")
+
+
+class Stats:
+    """Request counters and a rolling window of latencies."""
+
+    def __init__(self, window=10000):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.status_counts = {}
+        self.latencies = deque(maxlen=self.window)
+
+    def record(self, status, body_bytes, latency):
+        self.requests += 1
+        self.bytes_sent += body_bytes
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.latencies.append(latency)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            idx = min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))
+            return round(latencies[idx] * 1000, 3)
+
+        uptime = time.time() - self.started
+        return {
+            'uptime_s': round(uptime, 1),
+            'requests': self.requests,
+            'requests_per_s': round(self.requests / uptime, 1) if uptime else 0.0,
+            'bytes_sent': self.bytes_sent,
+            'status': {str(k): v for k, v in sorted(self.status_counts.items())},
+            'latency_ms': {
+                'samples': len(latencies),
+                'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'p99': percentile(99),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range `bytes=` header.
+
+    Returns:
+        (start, end) inclusive, None to serve the full body, or 'invalid' for 416
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        # Multiple ranges are allowed to be answered with the full body
+        return None
+    if size == 0:
+        # No byte of an empty body can be selected
+        return 'invalid'
+
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return 'invalid'
+            return (max(size - suffix, 0), size - 1)
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        return 'invalid'
+    return (start, min(end, size - 1))
+
+
+class AssetServer:
+    """Minimal HTTP/1.1 keep-alive server over the configured mounts."""
+
+    def __init__(self, mounts, cache):
+        # Longest prefix first so nested mounts win
+        self.mounts = sorted(mounts, key=lambda m: len(m[0]), reverse=True)
+        self.cache = cache
+        self.stats = Stats()
+
+    def find_source(self, path):
+        for prefix, source in self.mounts:
+            if prefix == '/' or path == prefix or path.startswith(prefix + '/'):
+                return prefix, source, path[len(prefix):].lstrip('/')
+        return None, None, None
+
+    async def load(self, path):
+        """
+        Return the cache entry for a request path, reading from the source on a miss.
+
+        Raises OSError if the file can't be read (e.g. removed after the version check).
+        """
+        prefix, source, rel_path = self.find_source(path)
+        if source is None or not rel_path:
+            return None
+
+        version = source.version(rel_path)
+        key = (prefix, rel_path)
+        if version is None:
+            self.cache.discard(key)
+            return None
+
+        entry = self.cache.get(key, version)
+        if entry is not None:
+            return entry
+
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, source.read, rel_path)
+        content_type = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        entry = Entry(bytes(data), content_type, version)
+        self.cache.put(key, entry)
+        return entry
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                started = time.perf_counter()
+                keep_alive, (status, sent) = await self.respond(head, writer)
+                await writer.drain()
+                self.stats.record(status, sent, time.perf_counter() - started)
+
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, head, writer):
+        """
+        Write the response for one request.
+
+        Returns:
+            (keep_alive, (status, body_bytes_sent))
+        """
+        try:
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            method, target, version = request_line.split(' ', 2)
+        except ValueError:
+            return False, self.send(writer, 400, b'Bad Request\n', {'Content-Type': 'text/plain'})
+
+        headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        head_only = method == 'HEAD'
+
+        if method not in ('GET', 'HEAD'):
+            return keep_alive, self.send(writer, 405, b'Method Not Allowed\n', {
+                'Content-Type': 'text/plain',
+                'Allow': 'GET, HEAD',
+            }, keep_alive)
+
+        url = urlsplit(target)
+        path = unquote(url.path)
+
+        if path == STATS_PATH:
+            body = json.dumps({
+                'server': self.stats.snapshot(),
+                'cache': self.cache.stats(),
+            }, indent=2).encode('utf-8')
+            if 'reset' in parse_qs(url.query):
+                self.stats.reset()
+                self.cache.hits = self.cache.misses = self.cache.evictions = 0
+            return keep_alive, self.send(writer, 200, body, {
+                'Content-Type': 'application/json',
+                'Cache-Control': 'no-store',
+            }, keep_alive, head_only)
+
+        try:
+            entry = await self.load(path)
+        except FileNotFoundError:
+            entry = None
+        except OSError as e:
+            print(f"Error reading {path}: {e}")
+            return keep_alive, self.send(writer, 500, b'Internal Server Error\n', {
+                'Content-Type': 'text/plain',
+            }, keep_alive, head_only)
+        if entry is None:
+            return keep_alive, self.send(writer, 404, b'Not Found\n', {
+                'Content-Type': 'text/plain',
+            }, keep_alive, head_only)
+
+        base_headers = {
+            'Content-Type': entry.content_type,
+            'ETag': entry.etag,
+            'Accept-Ranges': 'bytes',
+            # Always revalidate so regenerated tiles show up immediately
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*',
+        }
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and (if_none_match.strip() == '*' or
+                              entry.etag in (tag.strip() for tag in if_none_match.split(','))):
+            return keep_alive, self.send(writer, 304, b'', base_headers, keep_alive, head_only=True)
+
+        data = entry.data
+        range_header = headers.get('range')
+        if_range = headers.get('if-range')
+        if range_header and (if_range is None or if_range == entry.etag):
+            byte_range = parse_range(range_header, len(data))
+            if byte_range == 'invalid':
+                return keep_alive, self.send(writer, 416, b'', {
+                    **base_headers,
+                    'Content-Range': f"bytes */{len(data)}",
+                }, keep_alive)
+            if byte_range is not None:
+                start, end = byte_range
+                return keep_alive, self.send(writer, 206, data[start:end + 1], {
+                    **base_headers,
+                    'Content-Range': f"bytes {start}-{end}/{len(data)}",
+                }, keep_alive, head_only)
+
+        return keep_alive, self.send(writer, 200, data, base_headers, keep_alive, head_only)
+
+    def send(self, writer, status, body, headers, keep_alive=False, head_only=False):
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS[status]}"]
+        headers = {
+            **headers,
+            'Date': formatdate(usegmt=True),
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }
+        if status != 304:
+            headers['Content-Length'] = str(len(body))
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+        sent = 0 if head_only else len(body)
+        if sent:
+            writer.write(body)
+        return status, sent
+
+
+def parse_mount(value):
+    """Parse PREFIX=PATH into (prefix, source); *.pack paths are served as pack files."""
+    prefix, sep, path = value.partition('=')
+    if not sep:
+        raise ValueError(f"mount must be PREFIX=PATH, got '{value}'")
+    prefix = '/' + prefix.strip('/')
+    path = Path(path)
+    if not path.is_absolute():
+        path = (Path.cwd() / path).resolve()
+    if not path.exists():
+        raise ValueError(f"{path} not found")
+    source = PackSource(path) if path.is_file() and path.suffix == '.pack' else DirectorySource(path)
+    return prefix, source
+
+
+async def serve(args, mounts):
+    cache = LRUCache(
+        max_bytes=args.cache_mb * 1024 * 1024,
+        max_entry_bytes=args.max_entry_kb * 1024,
+    )
+    server = AssetServer(mounts, cache)
+    tcp_server = await asyncio.start_server(
+        server.handle, args.host, args.port, limit=MAX_HEADER_BYTES
+    )
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    for prefix, source in server.mounts:
+        print(f"  {prefix} -> {source.describe()}")
+    print(f"  {STATS_PATH} -> stats (add ?reset=1 to reset counters)")
+    print(f"Cache: {args.cache_mb} MB, max entry {args.max_entry_kb} KB")
+
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve map tiles and data assets locally with an LRU cache',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Serve public/tiles at /tiles and src/assets at /assets
+  python serve_assets.py
+
+  # Pack the tiles into a single file and serve it instead
+  python serve_assets.py --build-pack ../public/tiles tiles.pack
+  python serve_assets.py --mount /tiles=tiles.pack
+
+  # Inspect latency and hit rate while load testing
+  curl http://127.0.0.1:8080/__stats
+        '''
+    )
+
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port (default: 8080)')
+    parser.add_argument(
+        '--mount',
+        action='append',
+        default=[],
+        help='PREFIX=PATH to serve a directory or .pack file (repeatable)'
+    )
+    parser.add_argument('--cache-mb', type=int, default=256, help='LRU cache size in MB (default: 256)')
+    parser.add_argument(
+        '--max-entry-kb',
+        type=int,
+        default=8192,
+        help='Files larger than this are not cached (default: 8192)'
+    )
+    parser.add_argument(
+        '--build-pack',
+        nargs=2,
+        metavar=('SOURCE_DIR', 'OUTPUT'),
+        help='Pack every file under SOURCE_DIR into OUTPUT and exit'
+    )
+
+    args = parser.parse_args()
+
+    if args.build_pack:
+        source_dir, output = args.build_pack
+        if not Path(source_dir).is_dir():
+            print(f"Error: {source_dir} is not a directory")
+            sys.exit(1)
+        build_pack(source_dir, output)
+        return
+
+    script_dir = Path(__file__).resolve().parent
+    # Explicit mounts must exist; defaults are skipped if not generated yet
+    explicit = bool(args.mount)
+    mount_specs = args.mount or [
+        f"/tiles={script_dir.parent / 'public' / 'tiles'}",
+        f"/assets={script_dir.parent / 'src' / 'assets'}",
+    ]
+
+    mounts = []
+    for spec in mount_specs:
+        try:
+            mounts.append(parse_mount(spec))
+        except ValueError as e:
+            if explicit:
+                print(f"Error: {e}")
+                sys.exit(1)
+            print(f"Warning: skipping default mount {spec.partition('=')[0]}: {e}")
+
+    if not mounts:
+        print("Error: nothing to serve")
+        sys.exit(1)
+
+    try:
+        asyncio.run(serve(args, mounts))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == '__main__':
+    main()